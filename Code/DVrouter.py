@@ -16,8 +16,8 @@ Class:
 
 
 # from collections import defaultdict
-from json import dumps, loads
-from router import Router
+from struct import pack, pack_into, iter_unpack, error as StructError
+from router import Router, addr_id, addr_of
 from packet import Packet
 # import dijkstar
 # import networkx
@@ -47,8 +47,23 @@ class DVrouter(Router):
         """Hints: initialize local state."""
         self.link = {}
         self.neighbor_node = {}
+        #broadcast fan-out cached as (neighbor, port) pairs; rebuilt on
+        #link changes only, so transmit loops skip the dict items view
+        self._neighbor_ports = ()
         self.distance = {self.addr: (0, None)} # distance to itself is 0
         self.unreachable = 16  #infinity
+        self._dirty = set()  #destinations changed since last transmission
+        self._by_nexthop = {}  #next hop -> set of destinations routed via it
+        #coalesce bursts of triggered updates behind a short settling window
+        self.settle_time = heartbeat_time // 10
+        self._pending_transmit = False
+        self._pending_since = 0
+        self._clock = 0  #latest time seen by handle_time
+        #heartbeats resend identical full dumps, so cache the encoded
+        #per-neighbor payloads and invalidate whenever distance mutates
+        self._dv_version = 0
+        self._payload_version = -1
+        self._cached_payloads = {}
 
     def handle_packet(self, port, packet: Packet):
         """
@@ -78,34 +93,38 @@ class DVrouter(Router):
             #forward is valid route drop if invalid route
         elif packet.isRouting():
             #process neighbour dv and then update local table for change in path
+            n_addr = packet.srcAddr
+            if n_addr not in self.neighbor_node:
+                return
+            neighbour_dv = self.neighbor_node[n_addr][1]
+            content = packet.getContent()
+            if not content:
+                return
             try:
-                n_addr = packet.srcAddr
-                if n_addr not in self.neighbor_node:
-                    return
-                neighbour_dv = self.neighbor_node[n_addr][1]
-                rcvd = loads(packet.getContent())
-                update_dv = False
-
-                for dst, dv_cost in rcvd.items():
-                    dv = dv_cost + neighbour_dv
-                    if dv >= self.unreachable:
-                        dv = self.unreachable
-
-                    current_dv, next_node = self.distance.get(dst, (self.unreachable, None))
-                    if (dv < current_dv) or (next_node == n_addr):
-                        if dv != current_dv:
-                            self.distance[dst] = (dv, n_addr)
-                            update_dv = True
-
-                current_link, _ = self.distance.get(n_addr, (self.unreachable, None))
-                if neighbour_dv < current_link:
-                    self.distance[n_addr] = (neighbour_dv, n_addr)
-                    update_dv = True
-
-                if update_dv:
-                    self.transmit_distance(poison_rev=True)  
-            except Exception as e:
-                print(f"error: {e}")
+                rcvd = self.decode_distance(content)
+            except (StructError, IndexError):
+                #truncated records or an address id we never interned
+                return
+            update_dv = False
+
+            for dst, dv_cost in rcvd.items():
+                dv = dv_cost + neighbour_dv
+                if dv >= self.unreachable:
+                    dv = self.unreachable
+
+                current_dv, next_node = self.distance.get(dst, (self.unreachable, None))
+                if (dv < current_dv) or (next_node == n_addr):
+                    if dv != current_dv:
+                        self._update_distance(dst, dv, n_addr)
+                        update_dv = True
+
+            current_link, _ = self.distance.get(n_addr, (self.unreachable, None))
+            if neighbour_dv < current_link:
+                self._update_distance(n_addr, neighbour_dv, n_addr)
+                update_dv = True
+
+            if update_dv:
+                self._schedule_transmit()
 
     def handle_new_link(self, port, endpoint, dist):
         """
@@ -121,11 +140,14 @@ class DVrouter(Router):
             - Update the forwarding table.
             - Broadcast the distance vector of this router to neighbor_node.
         """
-        self.distance[endpoint] = (dist, endpoint)
+        self._update_distance(endpoint, dist, endpoint)
         self.neighbor_node[endpoint] = (port, dist)
         self.link[port] = (endpoint, dist)
+        self._neighbor_ports = tuple(
+            (nbr, p) for nbr, (p, _) in self.neighbor_node.items())
         #send updated dv and enable poison reverse
-        self.transmit_distance(poison_rev=True)
+        #full dump so the new neighbor learns the whole table at once
+        self.transmit_distance(poison_rev=True, force_full=True)
 
     def handle_remove_link(self, port):
         """
@@ -146,17 +168,18 @@ class DVrouter(Router):
         del self.link[port]
         if endpoint in self.neighbor_node:
             del self.neighbor_node[endpoint]
-        #remove neighbour enrty, next hop 
+        self._neighbor_ports = tuple(
+            (nbr, p) for nbr, (p, _) in self.neighbor_node.items())
+        #remove neighbour enrty, next hop
         update_dv = False
-        for dst in list(self.distance.keys()):
-            _, n = self.distance[dst]
-            if n == endpoint:
+        #only destinations routed via the lost neighbor need touching
+        for dst in self._by_nexthop.pop(endpoint, ()):
             #cost to unreachable
-                self.distance[dst] = (self.unreachable, None)
-                update_dv = True
+            self._update_distance(dst, self.unreachable, None)
+            update_dv = True
 
         if update_dv:
-            self.transmit_distance(poison_rev=True)
+            self._schedule_transmit()
 
     def handle_time(self, time_milli_secs):
         """
@@ -167,30 +190,117 @@ class DVrouter(Router):
 
         If the time since the last broadcast exceeds the heartbeat interval:
             - Broadcast the distance vector of this router to neighbor_node.
+        A pending triggered update is flushed once its settling window expires.
         """
+        self._clock = time_milli_secs
         if time_milli_secs - self.last_time >= self.heartbeat_time:
             self.last_time = time_milli_secs
             #prevent loop so poison
+            self.transmit_distance(poison_rev=True, force_full=True)
+            self._pending_transmit = False
+        elif self._pending_transmit and \
+                time_milli_secs - self._pending_since >= self.settle_time:
             self.transmit_distance(poison_rev=True)
+            self._pending_transmit = False
 
+    def _update_distance(self, dst, cost, next_hop):
+        """
+        write one distance entry, keeping the per-next-hop buckets, the
+        dirty set, and the payload-cache version in sync
+        """
+        old = self.distance.get(dst)
+        if old is not None and old[1] is not None and old[1] != next_hop:
+            bucket = self._by_nexthop.get(old[1])
+            if bucket is not None:
+                bucket.discard(dst)
+                if not bucket:
+                    del self._by_nexthop[old[1]]
+        if next_hop is not None:
+            self._by_nexthop.setdefault(next_hop, set()).add(dst)
+        self.distance[dst] = (cost, next_hop)
+        self._dirty.add(dst)
+        self._dv_version += 1
+
+    def _schedule_transmit(self):
+        """
+        mark a triggered update pending; handle_time emits it after the
+        settling window so a burst of changes collapses into one broadcast
+        """
+        if not self._pending_transmit:
+            self._pending_transmit = True
+            self._pending_since = self._clock
 
-    def transmit_distance(self, poison_rev=False):
+    def transmit_distance(self, poison_rev=False, force_full=False):
         """
-        transmit dv to neighbors
+        transmit dv to neighbors as packed binary records
+
+        Heartbeats (and new links) send the full table with force_full;
+        triggered updates send only the entries dirtied since the last
+        transmission, DSDV style.
         """
-        #packet contents
-        send_pkt = []
-        for neighbor, (port, _) in self.neighbor_node.items():
-            neighbour_dv = {
-                dst: self.unreachable if (poison_rev and next_hop == neighbor) else dist
-                for dst, (dist, next_hop) in self.distance.items()
-            }
-            send_pkt.append((port, neighbour_dv))
+        if force_full:
+            entries = self.distance
+            #drop stale cached payloads once the table has moved on
+            if self._payload_version != self._dv_version:
+                self._cached_payloads.clear()
+                self._payload_version = self._dv_version
+        elif self._dirty:
+            entries = {dst: self.distance[dst]
+                       for dst in self._dirty if dst in self.distance}
+        else:
+            return  #nothing changed, nothing to send
+
+        cacheable = force_full and poison_rev
+        records = None
+        poison_offsets = None
 
         #do all transmissions
-        for port, neighbour_dv in send_pkt:
-            pkt = Packet(Packet.ROUTING, self.addr, 'ALL', dumps(neighbour_dv))
-            self.send(port, pkt.copy())
+        for neighbor, port in self._neighbor_ports:
+            payload = self._cached_payloads.get(neighbor) if cacheable else None
+            if payload is None:
+                if records is None:
+                    records, poison_offsets = self._encode_entries(entries, force_full)
+                if poison_rev and neighbor in poison_offsets:
+                    #clone the shared buffer and poison only this neighbor's costs
+                    buf = bytearray(records)
+                    for offset in poison_offsets[neighbor]:
+                        pack_into('!H', buf, offset, self.unreachable)
+                    payload = bytes(buf)
+                else:
+                    payload = bytes(records)
+                if cacheable:
+                    self._cached_payloads[neighbor] = payload
+            #no copy here: Link.send already clones before queueing
+            pkt = Packet(Packet.ROUTING, self.addr, 'ALL', payload)
+            self.send(port, pkt)
+
+        self._dirty.clear()
+
+    @staticmethod
+    def _encode_entries(entries, force_full):
+        """
+        pack dv entries into one buffer of fixed-width full_flag then
+        addr_id|cost records, remembering where each cost field sits
+        bucketed by next hop for poison reverse
+        """
+        records = bytearray(pack('!B', 1 if force_full else 0))
+        poison_offsets = {}
+        for dst, (dist, next_hop) in entries.items():
+            records += pack('!H', addr_id(dst))
+            poison_offsets.setdefault(next_hop, []).append(len(records))
+            records += pack('!H', dist)
+        return records, poison_offsets
+
+    @staticmethod
+    def decode_distance(content):
+        """
+        decode a packed dv payload back into a dict of dst -> cost
+
+        The leading flag byte marks full dumps vs deltas; the receive-side
+        merge is per-entry either way, so both decode the same.
+        """
+        return {addr_of(aid): cost
+                for aid, cost in iter_unpack('!HH', memoryview(content)[1:])}
 
     def debug_string(self):
         """
@@ -16,23 +16,42 @@ Class:
 """
 
 # from collections import defaultdict
-from router import Router
+from router import Router, dumps, loads
 from packet import Packet
-from json import dumps, loads
-from dijkstar import Graph, find_path, algorithm
+from heapq import heappush, heappop
 
-# import dijkstar
-# import networkx
 # from copy import deepcopy
 
-#dijkstar- shortest path from one point to another
 #shortest path- least cost path
 #conflicting info about packets
 #compares updated sequence number(higher) and discard other one- slow path
 #LS packet includes seq num and info about neighbours
 #change in topology- link added, router added, router gone down
 #inherits from the router class
-#use only one dijkstar or netwrokx
+
+
+def _dijkstra_kernel(adj, src):
+    """
+    single-source Dijkstra over a plain dict-of-dict adjacency
+
+    Kept as a module-level function over primitive containers (the shape
+    a JIT compiler could take wholesale); returns the predecessor map for
+    every reachable node.
+    """
+    dist = {src: 0}
+    prev = {src: None}
+    heap = [(0, src)]
+    while heap:
+        d, node = heappop(heap)
+        if d > dist.get(node, d):
+            continue  #stale heap entry
+        for neighbour_node, cost in adj.get(node, {}).items():
+            nd = d + cost
+            if nd < dist.get(neighbour_node, nd + 1):
+                dist[neighbour_node] = nd
+                prev[neighbour_node] = node
+                heappush(heap, (nd, neighbour_node))
+    return prev
 
 
 class LSrouter(Router):
@@ -53,9 +72,34 @@ class LSrouter(Router):
         self.link = {}
         self.l_state = {addr: {'seq': self.seq_num, 'links': {}}}
         self.routing_table = {}
+        #highest seq per source each neighbor is known to have, so floods
+        #can skip neighbors that already hold the LSA
+        self._neighbor_seq = {}
+        #adjacency kept in sync with l_state so recomputes skip the full rebuild
+        self._graph_adj = {}
+        #reverse index of self.link for O(1) next-hop -> port lookup
+        self._endpoint_to_port = {}
+        #broadcast fan-out cached as a tuple; rebuilt on link changes only
+        self._neighbor_ports = ()
+        #every node ever seen in an LSA; grown incrementally so the
+        #recompute loop doesn't re-scan l_state (stale entries just miss
+        #the predecessor map and are skipped)
+        self._all_destinations = {addr}
+        #suppress heartbeat floods while our own LSA is unchanged, but
+        #still refresh it periodically
+        self.refresh_interval = heartbeat_time * 3
+        self._last_flood_links = None
+        self._last_flood_time = 0
+        #link-event floods are coalesced: handlers set the flag, the next
+        #handle_time tick emits one flood for the whole burst
+        self._flood_pending = False
+        #bumped only when the LSDB actually changes shape; calculate_route
+        #is a no-op while the forwarding table matches this version
+        self._lsdb_version = 0
+        self._ft_version = -1
         """Hints: initialize local state."""
 
-        #routing table, graph -> dijkstar -> unweight/weight, weighted/unweighted
+        #routing table, graph adjacency -> heapq dijkstra kernel
 
     def handle_packet(self, port, packet: Packet):
         """
@@ -79,20 +123,64 @@ class LSrouter(Router):
         #links indexed by port- which port to send it on- take care of mapping
         #not allowed to access from DSrouter- figure out the route
         if packet.isRouting():
+            #the payload is "<seq> <json links>": the seq rides as a plain
+            #text prefix (the originator is already packet.srcAddr), so
+            #stale duplicates are dropped before any JSON decoding
+            content = packet.getContent()
+            if isinstance(content, bytes):
+                head, _, body = content.partition(b" ")
+                head = head.decode("ascii", "replace")
+            else:
+                head, _, body = content.partition(" ")
             try:
-                routing_data = loads(packet.getContent())
-                source = routing_data['source']
-                seq = routing_data['seq']
-                links = routing_data['links']
-                #flooding to all ports but not the one it came from
-                if source not in self.l_state or seq > self.l_state[source]['seq']:
-                    self.l_state[source] = {'seq': seq,'links': links}
-                    for i in self.link:
-                        if i != port:
-                            self.send(i, packet.copy())
-                    self.calculate_route()
-            except:
-                pass
+                seq = int(head)
+            except ValueError:
+                return
+            source = packet.srcAddr
+            #the forwarding neighbor implicitly holds this (source, seq)
+            if port in self.link:
+                sender_known = self._neighbor_seq.setdefault(self.link[port][0], {})
+                if seq > sender_known.get(source, -1):
+                    sender_known[source] = seq
+            #most flooded LSAs are duplicates; reject on seq alone
+            if source in self.l_state and seq <= self.l_state[source]['seq']:
+                return
+            try:
+                routing_data = loads(body)
+            except ValueError:
+                #both orjson and stdlib json raise ValueError subclasses
+                return
+            #validate shape explicitly instead of catching whatever breaks
+            if not isinstance(routing_data, dict):
+                return
+            links = routing_data.get('links')
+            if not isinstance(links, dict):
+                return
+            if source in self.l_state and self.l_state[source]['links'] == links:
+                #heartbeat-driven seq bump with identical content:
+                #record the seq, skip re-flood and recompute (no LSA
+                #aging here, so suppressing propagation is safe)
+                self.l_state[source]['seq'] = seq
+                return
+            old_links = self.l_state[source]['links'] if source in self.l_state else {}
+            self.l_state[source] = {'seq': seq,'links': links}
+            self._update_graph(source, old_links, links)
+            self._all_destinations.add(source)
+            self._all_destinations.update(links.keys())
+            self._lsdb_version += 1
+            #flooding to all ports but not the one it came from,
+            #skipping neighbors already known to have this LSA
+            for i in self.link:
+                if i == port:
+                    continue
+                neighbour = self.link[i][0]
+                if neighbour == source or \
+                        self._neighbor_seq.get(neighbour, {}).get(source, -1) >= seq:
+                    continue
+                #Link.send clones before queueing, so the received
+                #packet can be forwarded out every port as-is
+                self.send(i, packet)
+            self.calculate_route()
         elif packet.is_traceroute():
             dst = packet.dstAddr
             if dst in self.routing_table:
@@ -117,9 +205,15 @@ class LSrouter(Router):
         self.seq_num += 1
         self.l_state[self.addr]['seq'] = self.seq_num
         self.link[port] = (endpoint, cost)
-        #flood changes and recalculate
+        self._endpoint_to_port[endpoint] = port
+        self._neighbor_ports = tuple(self.link)
+        self._all_destinations.add(endpoint)
+        self._graph_adj.setdefault(self.addr, {})[endpoint] = cost
+        self._graph_adj.setdefault(endpoint, {})[self.addr] = cost
+        self._lsdb_version += 1
+        #recalculate now, flood once the burst of changes has drained
         self.calculate_route()
-        self.flooding_to_neighbours()
+        self._flood_pending = True
 
     def handle_remove_link(self, port):
         """
@@ -139,10 +233,15 @@ class LSrouter(Router):
         self.seq_num += 1
         if endpoint in self.l_state[self.addr]['links']:
             del self.l_state[self.addr]['links'][endpoint]
+            self._remove_graph_edge(self.addr, endpoint)
         self.l_state[self.addr]['seq'] = self.seq_num
         del self.link[port]
-        #flood and recalculate
-        self.flooding_to_neighbours()
+        self._endpoint_to_port.pop(endpoint, None)
+        self._neighbor_ports = tuple(self.link)
+        self._neighbor_seq.pop(endpoint, None)
+        self._lsdb_version += 1
+        #recalculate now, flood once the burst of changes has drained
+        self._flood_pending = True
         self.calculate_route()
 
     def handle_time(self, time_milli_secs):
@@ -154,58 +253,90 @@ class LSrouter(Router):
             time_milli_secs: The current time in milliseconds.
 
         If the time since the last broadcast exceeds the heartbeat interval:
-            - Broadcast the link state of this router to all neighbors.
+            - Broadcast the link state of this router to all neighbors,
+              unless it is unchanged and was refreshed recently.
         """
+        if self._flood_pending:
+            #one flood covers every link change since the last tick
+            self._flood_pending = False
+            self._last_flood_time = time_milli_secs
+            self.flooding_to_neighbours()
         if time_milli_secs - self.last_time >= self.heartbeat_time:
             self.last_time = time_milli_secs
+            if self.l_state[self.addr]['links'] == self._last_flood_links and \
+                    time_milli_secs - self._last_flood_time < self.refresh_interval:
+                return  #idle network: nothing new to tell the neighbors
             self.seq_num += 1
             self.l_state[self.addr]['seq'] = self.seq_num
+            self._last_flood_time = time_milli_secs
             self.flooding_to_neighbours()
 
     def flooding_to_neighbours(self):
         """
         flood the link state to all neighbors
         """
-        update = {
-            'source': self.addr,
-            'seq': self.seq_num,
-            'links': self.l_state[self.addr]['links']
-        }
-        update_packet = Packet(Packet.ROUTING, self.addr, 'ALL', dumps(update))
-        for i in self.link:
-            self.send(i, update_packet.copy())
+        #seq travels as a text prefix so receivers can dedup without
+        #decoding the JSON body; the originator is the packet srcAddr
+        body = dumps({'links': self.l_state[self.addr]['links']})
+        if isinstance(body, bytes):
+            content = f"{self.seq_num} ".encode() + body
+        else:
+            content = f"{self.seq_num} " + body
+        update_packet = Packet(Packet.ROUTING, self.addr, 'ALL', content)
+        for i in self._neighbor_ports:
+            #Link.send clones before queueing
+            self.send(i, update_packet)
+        self._last_flood_links = dict(self.l_state[self.addr]['links'])
+
+    def _update_graph(self, source, old_links, new_links):
+        """
+        apply one LSA's link diff to the cached graph
+        """
+        for neighbour_node, c in new_links.items():
+            self._graph_adj.setdefault(source, {})[neighbour_node] = c
+            self._graph_adj.setdefault(neighbour_node, {})[source] = c
+        for neighbour_node in old_links.keys() - new_links.keys():
+            self._remove_graph_edge(source, neighbour_node)
 
-    def calculate_route(self):
+    def _remove_graph_edge(self, source, neighbour_node):
         """
-        calculate the shortest path
+        drop both directions of an edge unless the other endpoint's LSA
+        still declares it
         """
-        graph = Graph()
-        #all routers
-        for nodes, state in self.l_state.items():
-            for neighbour_node, c in state['links'].items():
-                graph.add_edge(nodes, neighbour_node, c)
-                graph.add_edge(neighbour_node, nodes, c)
+        if source in self.l_state.get(neighbour_node, {}).get('links', {}):
+            return
+        for u, v in ((source, neighbour_node), (neighbour_node, source)):
+            edges = self._graph_adj.get(u)
+            if edges is not None:
+                edges.pop(v, None)
+                if not edges:
+                    del self._graph_adj[u]
 
+    def calculate_route(self):
+        """
+        calculate the shortest paths with one single-source pass over the
+        cached adjacency; no-op while the LSDB version is unchanged
+        """
+        if self._ft_version == self._lsdb_version:
+            return
+        self._ft_version = self._lsdb_version
         self.routing_table= {}
-        dst_nodes = set()
-        for nodes in self.l_state:
-            dst_nodes.add(nodes)
-            dst_nodes.update(self.l_state[nodes]['links'].keys())
-        #shortest paths
-        for dest in dst_nodes:
-            #skip self
-            if dest == self.addr:
+        predecessors = _dijkstra_kernel(self._graph_adj, self.addr)
+        #first hops from the predecessor map
+        for dest in self._all_destinations:
+            #skip self and unreachable nodes
+            if dest == self.addr or dest not in predecessors:
                 continue
-            try:
-                shortest_path = find_path(graph, self.addr, dest)
-                #first hop
-                next_hop = shortest_path.nodes[1]
-                for port, (n, _) in self.link.items():
-                    if n == next_hop:
-                        self.routing_table[dest] = port
-                        break
-            except (algorithm.NoPathError, KeyError):
-                pass
+            node = dest
+            prev = predecessors[node]
+            while prev is not None and prev != self.addr:
+                node = prev
+                prev = predecessors[node]
+            if prev != self.addr:
+                continue
+            port = self._endpoint_to_port.get(node)
+            if port is not None:
+                self.routing_table[dest] = port
 
     def debug_string(self):
         """
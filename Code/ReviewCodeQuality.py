@@ -2,6 +2,11 @@ import subprocess
 import argparse
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+# compiled once at import instead of per call
+_ANSI_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+_PYLINT_RATING_RE = re.compile(r'Your code has been rated at ([\d\.]+)/10')
 
 
 def calculate_mi_marks(rank):
@@ -38,6 +43,25 @@ def calculate_cc_marks(average_complexity_grade):
             return 0.1
 
 
+def calculate_cc_grade(average_complexity):
+    """
+    Map an average cyclomatic complexity score to radon's letter grade.
+    """
+    match average_complexity:
+        case score if score <= 5:
+            return 'A'
+        case score if score <= 10:
+            return 'B'
+        case score if score <= 20:
+            return 'C'
+        case score if score <= 30:
+            return 'D'
+        case score if score <= 40:
+            return 'E'
+        case _:
+            return 'F'
+
+
 def calculate_comments_marks(comments_ratio):
     """
     Calculate marks based on the comments ratio.
@@ -80,44 +104,52 @@ def strip_ansi_codes(text):
     """
     Removes ANSI color codes from the given text.
     """
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
+    return _ANSI_RE.sub('', text)
 
 
 def run_command(command):
     """
-    Runs a subprocess command, displays output to the screen, and captures it.
+    Runs a subprocess command, streaming its output to the screen line by
+    line while capturing it, instead of buffering everything up front.
     """
     process = subprocess.Popen(
         command,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
+        bufsize=1,
         text=True
     )
 
-    stdout, stderr = process.communicate()
+    # stream stdout as it is produced; stderr stays separate so json
+    # output on stdout is never polluted by tool warnings
+    out_lines = []
+    for line in process.stdout:
+        print(line, end="")
+        out_lines.append(line)
+    stderr = process.stderr.read()
+    process.wait()
 
-    print(stdout, end="")
     print(stderr, end="")
 
-    return stdout, stderr
+    return ''.join(out_lines), stderr
 
 
-def check_pylint(file_path):
-    """Runs Pylint on the given file and reports the modularity rating.
+def check_pylint(file_paths):
+    """Runs Pylint once over all the given files and reports the rating.
 
     Args:
-        file_path (str): The path to the Python file to be checked.
+        file_paths (list): Paths to the Python files to be checked.
 
     Returns:
-        float: The code quality rating of the file as reported by Pylint. 
-               If the rating cannot be determined, returns 0."""
+        float: The code quality rating of the run as reported by Pylint.
+               Pylint emits a single rating per invocation, so batching
+               the files yields one combined score. If the rating cannot
+               be determined, returns 0."""
 
-    command = ['pylint', file_path]
+    command = ['pylint', *file_paths]
     stdout, _ = run_command(command)
 
-    rating_match = re.search(
-        r'Your code has been rated at ([\d\.]+)/10', stdout)
+    rating_match = _PYLINT_RATING_RE.search(stdout)
     if rating_match:
         rating = float(rating_match.group(1))
     else:
@@ -126,52 +158,77 @@ def check_pylint(file_path):
     return rating
 
 
-def check_radon(file_path):
-    """ Runs Radon on the given file and reports cyclomatic complexity and maintainability index.
+def _flatten_cc_blocks(blocks):
+    """
+    Flatten radon cc JSON blocks, counting classes, methods, and closures
+    the same way radon's own --total-average does.
+    """
+    flat = []
+    for block in blocks:
+        flat.append(block)
+        flat.extend(block.get('methods', []))
+        flat.extend(block.get('closures', []))
+    return flat
+
+
+def check_radon(file_paths):
+    """ Runs each Radon command once over all files and reports cyclomatic
+    complexity and maintainability index per file.
     Parameters:
-    file_path (str): The path to the file to be analyzed.
+    file_paths (list): The paths to the files to be analyzed.
     Returns:
-    dict: A dictionary containing the following keys:
+    dict: A dictionary keyed by file path whose values contain:
         - 'mi' (int): The maintainability index of the file.
         - 'rank' (str): The maintainability rank of the file.
         - 'cc_grade' (str): The cyclomatic complexity grade of the file.
         - 'cc_score' (float): The cyclomatic complexity score of the file.
+        - 'comments_ratio' (float): The comments-to-sloc ratio of the file.
     """
 
-    # -s for summary and --total-average for average
-    command_cc = ['radon', 'cc', '-s', '--total-average', file_path]
-    stdout_cc, _ = run_command(command_cc)
-
-    cleaned_result = strip_ansi_codes(stdout_cc)
-    average_match = re.search(
-        r'Average complexity: ([A-F]) \((\d+\.?\d*)\)', cleaned_result)
-    if average_match:
-        grade = average_match.group(1)
-        score = float(average_match.group(2))
-    else:
-        grade = 'F'
-        score = 0
+    # each tool accepts multiple paths and keys its json output by path,
+    # so one process per tool covers every file; the three processes are
+    # independent and mostly subprocess-wait, so run them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        future_cc = executor.submit(
+            run_command, ['radon', 'cc', '-s', '-j', *file_paths])
+        future_mi = executor.submit(
+            run_command, ['radon', 'mi', '-s', '-j', *file_paths])
+        future_raw = executor.submit(
+            run_command, ['radon', 'raw', '-j', *file_paths])
 
-    # -s for summary and -j for json output
-    command_mi = ['radon', 'mi', '-s', '-j', file_path]
-    stdout_mi, _ = run_command(command_mi)
+    stdout_cc, _ = future_cc.result()
+    output_cc = json.loads(strip_ansi_codes(stdout_cc))
 
-    output = json.loads(stdout_mi)
-    # the outputed nested json object has a key that is the file path and value is the analysis
-    file_key = list(output.keys())[0]
-    mi = output[file_key]['mi'] if 'mi' in output[file_key] else 0
-    rank = output[file_key]['rank'] if 'rank' in output[file_key] else 'F'
+    stdout_mi, _ = future_mi.result()
+    output_mi = json.loads(stdout_mi)
 
-    command_comments = ['radon', 'raw', '-j', file_path]  # -j for json output
-    stdout_comments, _ = run_command(command_comments)
+    stdout_comments, _ = future_raw.result()
     output_comments = json.loads(stdout_comments)
-    file_key_comments = list(output_comments.keys())[0]
 
-    sloc = output_comments[file_key_comments]['sloc']
-    comments = output_comments[file_key_comments]['comments']
-    ratio = comments / sloc if sloc > 0 else 0
+    results = {}
+    for file_path in file_paths:
+        blocks = output_cc.get(file_path)
+        if isinstance(blocks, list) and blocks:
+            flat = _flatten_cc_blocks(blocks)
+            score = sum(block['complexity'] for block in flat) / len(flat)
+            grade = calculate_cc_grade(score)
+        else:
+            grade = 'F'
+            score = 0
+
+        file_mi = output_mi.get(file_path, {})
+        mi = file_mi['mi'] if 'mi' in file_mi else 0
+        rank = file_mi['rank'] if 'rank' in file_mi else 'F'
 
-    return {'mi': mi, 'rank': rank, 'cc_grade': grade, 'cc_score': score, 'comments_ratio': ratio}
+        file_raw = output_comments.get(file_path, {})
+        sloc = file_raw.get('sloc', 0)
+        comments = file_raw.get('comments', 0)
+        ratio = comments / sloc if sloc > 0 else 0
+
+        results[file_path] = {'mi': mi, 'rank': rank, 'cc_grade': grade,
+                              'cc_score': score, 'comments_ratio': ratio}
+
+    return results
 
 
 if __name__ == "__main__":
@@ -192,16 +249,24 @@ if __name__ == "__main__":
     total_marks = total_mi_marks + total_cc_marks + \
         total_pylint_marks + total_comments_marks
 
+    # one batched run per tool instead of ~4 subprocesses per file,
+    # with pylint and the radon tools running side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pylint_future = executor.submit(check_pylint, args.file_paths)
+        radon_future = executor.submit(check_radon, args.file_paths)
+
+    pylint_rating = pylint_future.result()
+    radon_scores = radon_future.result()
+
     for file_path in args.file_paths:
         print(f"Processing: {file_path}")
         try:
-            pylint_issues = check_pylint(file_path)
-            scores = check_radon(file_path)
+            scores = radon_scores[file_path]
 
             mi_marks = calculate_mi_marks(scores['rank'])
             cc_marks = calculate_cc_marks(scores['cc_grade'])
             comments_marks = calculate_comments_marks(scores['comments_ratio'])
-            pylint_marks = calculate_pylint_marks(pylint_issues)
+            pylint_marks = calculate_pylint_marks(pylint_rating)
 
             final_score = mi_marks + cc_marks + pylint_marks + comments_marks
             total_scores += final_score
@@ -219,7 +284,7 @@ if __name__ == "__main__":
 
     if total_files > 0:
         average_score = total_scores / total_files
-        print(f"Average Score for {total_files} file(s): {
-              average_score}/{total_marks}")
+        print(f"Average Score for {total_files} file(s): "
+              f"{average_score}/{total_marks}")
     else:
         print("No valid files processed.")
@@ -21,6 +21,12 @@ class Link:
         self.latencyMultiplier = latency
         self.e1 = e1
         self.e2 = e2
+        self.wakes = {}  # receiver address -> callable invoked on delivery
+
+
+    def registerWake(self, addr, notify):
+        """Register a callable to invoke whenever a packet is queued for addr"""
+        self.wakes[addr] = notify
 
 
     def send_helper(self, packet, src):
@@ -31,20 +37,29 @@ class Link:
             packet.animateSend(self.e1, self.e2, self.l12)
             time.sleep(self.l12/float(1000))
             self.q12.put(packet)
+            self._notify(self.e2)
         elif src == self.e2:
             packet.addToRoute(self.e1)
             packet.animateSend(self.e2, self.e1, self.l21)
             time.sleep(self.l21/float(1000))
             self.q21.put(packet)
+            self._notify(self.e1)
         sys.stdout.flush()
 
 
+    def _notify(self, dst):
+        """Wake the receiver, if it registered for wakeups"""
+        wake = self.wakes.get(dst)
+        if wake is not None:
+            wake()
+
+
     def send(self, packet, src):
         """Sends packet on link FROM src. Checks that packet content is
            a string and starts a new thread to send it.
            (src must be equal to self.e1 or self.e2)"""
         if packet.content:
-            assert type(packet.content) is str, "Packet content must be a string"
+            assert type(packet.content) in (str, bytes), "Packet content must be a string or bytes"
         p = packet.copy()
         _thread.start_new_thread(self.send_helper, (p, src))
 
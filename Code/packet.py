@@ -17,7 +17,7 @@ class Packet:
         self.kind = kind        # either TRACEROUTE or ROUTING
         self.srcAddr = srcAddr  # address of the source of the packet
         self.dstAddr = dstAddr  # address of the destination of the packet
-        self.content = content  # content of the packet (must be a string)
+        self.content = content  # content of the packet (must be a string or bytes)
         self.route = [srcAddr]  # DO NOT access from DSrouter or LSrouter
 
 